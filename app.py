@@ -1,58 +1,117 @@
-from flask import Flask, request, jsonify, render_template_string
+from flask import Flask, request, jsonify, render_template_string, send_file
 from flask_cors import CORS
 import os
+import gzip
+import hashlib
+import msgpack
 from feature import PhishingDetector
+from feature_store import FeatureStore
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 app = Flask(__name__)
 CORS(app)
 
-# Read HTML file content
-def read_html():
+# Every analysis is recorded here for offline re-scoring (see feature_store.py)
+feature_store = FeatureStore(
+    os.environ.get('PHISHGUARD_FEATURE_STORE', os.path.join(app.root_path, 'feature_store'))
+)
+
+def load_static_asset(filename, mimetype, render=False):
+    """Read a static file once and prepare its ETag and gzip/brotli variants"""
     try:
-        with open('index.html', 'r', encoding='utf-8') as f:
-            return f.read()
+        with open(os.path.join(app.root_path, filename), 'r', encoding='utf-8') as f:
+            content = f.read()
     except FileNotFoundError:
-        return "<h1>Error: index.html not found</h1>"
+        return None
+    
+    if render:
+        with app.app_context():
+            content = render_template_string(content)
+    
+    body = content.encode('utf-8')
+    etag = hashlib.sha256(body).hexdigest()[:32]
+    variants = {'identity': body}
+    
+    # Only keep compressed variants that are actually smaller
+    compressed = gzip.compress(body, compresslevel=9, mtime=0)
+    if len(compressed) < len(body):
+        variants['gzip'] = compressed
+    if brotli is not None:
+        compressed = brotli.compress(body, quality=11)
+        if len(compressed) < len(body):
+            variants['br'] = compressed
+    
+    return {'mimetype': mimetype, 'etag': etag, 'variants': variants}
+
+def serve_static_asset(asset):
+    """Serve a preloaded asset, negotiating encoding and answering conditional GETs"""
+    # best_match skips encodings the client refuses with q=0 and prefers br on ties
+    encoding = request.accept_encodings.best_match(
+        [candidate for candidate in ('br', 'gzip') if candidate in asset['variants']],
+        default='identity'
+    )
+    
+    response = app.response_class(asset['variants'][encoding], mimetype=asset['mimetype'])
+    if encoding != 'identity':
+        response.content_encoding = encoding
+    
+    # Each encoding is a different representation, so it gets its own ETag
+    response.set_etag(asset['etag'] if encoding == 'identity' else f"{asset['etag']}-{encoding}")
+    response.vary.add('Accept-Encoding')
+    # URLs are not versioned, so browsers must revalidate every time; repeat views are a cheap 304
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+# filename -> (mimetype, render through Jinja)
+STATIC_FILES = {
+    'index.html': ('text/html', True),
+    'style.css': ('text/css', False),
+    'script.js': ('application/javascript', False)
+}
+
+STATIC_ASSETS = {filename: load_static_asset(filename, *options) for filename, options in STATIC_FILES.items()}
+
+def get_static_asset(filename):
+    """Preloaded asset, re-read from disk in debug mode so front-end edits show up without a restart"""
+    if app.debug:
+        return load_static_asset(filename, *STATIC_FILES[filename])
+    return STATIC_ASSETS[filename]
 
 @app.route('/')
 def home():
     """Serve the main HTML page"""
-    html_content = read_html()
-    return render_template_string(html_content)
+    asset = get_static_asset('index.html')
+    if asset is None:
+        return "<h1>Error: index.html not found</h1>"
+    return serve_static_asset(asset)
 
 @app.route('/style.css')
 def css():
     """Serve CSS file"""
-    try:
-        with open('style.css', 'r', encoding='utf-8') as f:
-            css_content = f.read()
-        response = app.response_class(
-            css_content,
-            mimetype='text/css'
-        )
-        return response
-    except FileNotFoundError:
+    asset = get_static_asset('style.css')
+    if asset is None:
         return "/* CSS file not found */", 404
+    return serve_static_asset(asset)
 
 @app.route('/script.js')
 def js():
     """Serve JavaScript file"""
-    try:
-        with open('script.js', 'r', encoding='utf-8') as f:
-            js_content = f.read()
-        response = app.response_class(
-            js_content,
-            mimetype='application/javascript'
-        )
-        return response
-    except FileNotFoundError:
+    asset = get_static_asset('script.js')
+    if asset is None:
         return "// JavaScript file not found", 404
+    return serve_static_asset(asset)
 
 @app.route('/src/assets/hero-cybersecurity.jpg')
 def hero_image():
     """Serve hero image"""
     try:
-        from flask import send_file
+        # send_file streams from disk (sendfile where available) and handles ETag/304 itself;
+        # without a max_age it sends Cache-Control: no-cache like the other assets
         return send_file('hero-cybersecurity.jpg', mimetype='image/jpeg')
     except FileNotFoundError:
         return "", 404
@@ -66,6 +125,9 @@ def analyze_url():
             return jsonify({'error': 'URL is required'}), 400
         
         url = data['url']
+        response_format = request.args.get('format') or data.get('format', 'full')
+        if response_format not in ('full', 'compact'):
+            return jsonify({'error': 'Invalid format. Use "full" or "compact"'}), 400
         
         # Validate URL
         if not url.startswith(('http://', 'https://')):
@@ -75,12 +137,38 @@ def analyze_url():
         detector = PhishingDetector()
         result = detector.analyze_url(url)
         
-        return jsonify(result)
+        try:
+            feature_store.append_result(result)
+        except Exception as e:
+            print(f"Error storing feature vector: {str(e)}")
+        
+        if response_format == 'compact':
+            return compact_response(result)
+        
+        return jsonify(result.to_dict())
         
     except Exception as e:
         print(f"Error analyzing URL: {str(e)}")
         return jsonify({'error': 'Analysis failed. Please try again.'}), 500
 
+def compact_response(result):
+    """Encode a compact result as MessagePack, packed binary or JSON based on the Accept header"""
+    encoding = request.accept_mimetypes.best_match(
+        ['application/json', 'application/msgpack', 'application/octet-stream'],
+        default='application/json'
+    )
+    
+    if encoding == 'application/msgpack':
+        return app.response_class(msgpack.packb(result.to_compact()), mimetype='application/msgpack')
+    if encoding == 'application/octet-stream':
+        return app.response_class(result.pack(), mimetype='application/octet-stream')
+    return jsonify(result.to_compact())
+
+@app.route('/schema')
+def schema():
+    """Feature metadata for compact /analyze responses"""
+    return jsonify(PhishingDetector().schema())
+
 @app.route('/health')
 def health_check():
     """Health check endpoint"""
@@ -4,6 +4,8 @@ Implements 24 sophisticated phishing detection features
 """
 
 import re
+import array
+import struct
 import urllib.parse
 import socket
 import ssl
@@ -15,6 +17,64 @@ import whois
 from bs4 import BeautifulSoup
 import time
 
+# Bumped whenever the feature order or the compact encoding changes
+SCHEMA_VERSION = 1
+
+# Compact classification codes, indexed by code
+CLASSIFICATIONS = ('Safe', 'Suspicious', 'Phishing')
+
+# Packed binary layout: schema version, score, confidence, classification code, 24 feature values
+COMPACT_FORMAT = struct.Struct('<BffB24b')
+
+class AnalysisResult:
+    """Result of a URL analysis, holding feature values in a fixed-order int8 array"""
+    __slots__ = ('url', 'values', 'descriptions', 'score', 'classification', 'confidence', '_detector')
+
+    def __init__(self, detector, url, values, descriptions, score, classification, confidence):
+        self._detector = detector
+        self.url = url
+        self.values = values
+        self.descriptions = descriptions
+        self.score = score
+        self.classification = classification
+        self.confidence = confidence
+
+    def to_dict(self):
+        """Full response with feature metadata and recommendations"""
+        features = [
+            {
+                'name': meta['name'],
+                'weight': meta['weight'],
+                'value': value,
+                'description': description
+            }
+            for meta, value, description in zip(self._detector.features.values(), self.values, self.descriptions)
+        ]
+        
+        return {
+            'url': self.url,
+            'overall_score': self.score,
+            'classification': self.classification,
+            'confidence': self.confidence,
+            'features': features,
+            'recommendations': self._detector.generate_recommendations(self.values, self.classification)
+        }
+
+    def to_compact(self):
+        """Compact response; classification codes and feature metadata are served by PhishingDetector.schema()"""
+        return {
+            'v': SCHEMA_VERSION,
+            'score': self.score,
+            'classification': CLASSIFICATIONS.index(self.classification),
+            'confidence': self.confidence,
+            'features': self.values.tolist()
+        }
+
+    def pack(self):
+        """Compact response as packed binary (see COMPACT_FORMAT)"""
+        return COMPACT_FORMAT.pack(SCHEMA_VERSION, self.score, self.confidence,
+                                   CLASSIFICATIONS.index(self.classification), *self.values)
+
 class PhishingDetector:
     def __init__(self):
         self.features = {
@@ -50,6 +110,9 @@ class PhishingDetector:
         ]
         
         self.suspicious_tlds = ['.tk', '.ml', '.ga', '.cf', '.cc', '.pw', '.top']
+        
+        # Normalized score cut-offs used by classify
+        self.thresholds = {'phishing': -30, 'suspicious': -10}
 
     def analyze_url(self, url):
         """Main analysis function that processes all 24 features"""
@@ -96,20 +159,19 @@ class PhishingDetector:
             features.append(self._check_whois_creation(domain))
             features.append(self._check_external_form_action(html_content, domain))
             
+            # Stored vectors, compact responses and /schema all rely on this order
+            if [key for key, _, _ in features] != list(self.features):
+                raise ValueError("Feature results do not match the order of self.features")
+            
+            values = array.array('b', [value for _, value, _ in features])
+            descriptions = [description for _, _, description in features]
+            
             # Calculate overall score
-            score_data = self._calculate_score(features)
-            
-            # Generate recommendations
-            recommendations = self._generate_recommendations(features, score_data['classification'])
-            
-            return {
-                'url': url,
-                'overall_score': score_data['score'],
-                'classification': score_data['classification'],
-                'confidence': score_data['confidence'],
-                'features': features,
-                'recommendations': recommendations
-            }
+            score_data = self.calculate_score(values)
+            
+            # Recommendations are generated on demand by AnalysisResult.to_dict()
+            return AnalysisResult(self, url, values, descriptions, score_data['score'],
+                                  score_data['classification'], score_data['confidence'])
             
         except Exception as e:
             print(f"Error analyzing URL {url}: {str(e)}")
@@ -120,12 +182,8 @@ class PhishingDetector:
         ip_pattern = r'^(\d{1,3}\.){3}\d{1,3}$'
         value = -1 if re.match(ip_pattern, hostname.split(':')[0]) else 0
         
-        return {
-            'name': self.features['IP_ADDRESS']['name'],
-            'weight': self.features['IP_ADDRESS']['weight'],
-            'value': value,
-            'description': 'URL uses IP address instead of domain name' if value == -1 else 'URL uses proper domain name'
-        }
+        return self._create_feature_result('IP_ADDRESS', value, 
+            'URL uses IP address instead of domain name' if value == -1 else 'URL uses proper domain name')
 
     def _check_long_url(self, url):
         """Feature 2: Check URL length"""
@@ -137,57 +195,36 @@ class PhishingDetector:
         else:
             value = 0
             
-        return {
-            'name': self.features['LONG_URL']['name'],
-            'weight': self.features['LONG_URL']['weight'],
-            'value': value,
-            'description': f'URL length: {length} characters'
-        }
+        return self._create_feature_result('LONG_URL', value, f'URL length: {length} characters')
 
     def _check_url_shortener(self, hostname):
         """Feature 3: Check if URL uses shortening service"""
         value = 1 if any(shortener in hostname.lower() for shortener in self.url_shorteners) else 0
         
-        return {
-            'name': self.features['URL_SHORTENER']['name'],
-            'weight': self.features['URL_SHORTENER']['weight'],
-            'value': value,
-            'description': 'URL uses shortening service' if value == 1 else 'URL does not use shortening service'
-        }
+        return self._create_feature_result('URL_SHORTENER', value, 
+            'URL uses shortening service' if value == 1 else 'URL does not use shortening service')
 
     def _check_at_symbol(self, url):
         """Feature 4: Check for @ symbol in URL"""
         value = -1 if '@' in url else 0
         
-        return {
-            'name': self.features['AT_SYMBOL']['name'],
-            'weight': self.features['AT_SYMBOL']['weight'],
-            'value': value,
-            'description': 'URL contains @ symbol (potential redirect)' if value == -1 else 'No @ symbol found'
-        }
+        return self._create_feature_result('AT_SYMBOL', value, 
+            'URL contains @ symbol (potential redirect)' if value == -1 else 'No @ symbol found')
 
     def _check_redirecting(self, url):
         """Feature 5: Check for redirecting with //"""
         redirect_pattern = r'\/\/.*\/\/'
         value = -1 if re.search(redirect_pattern, url) else 0
         
-        return {
-            'name': self.features['REDIRECTING']['name'],
-            'weight': self.features['REDIRECTING']['weight'],
-            'value': value,
-            'description': 'URL contains redirecting //' if value == -1 else 'No suspicious redirects found'
-        }
+        return self._create_feature_result('REDIRECTING', value, 
+            'URL contains redirecting //' if value == -1 else 'No suspicious redirects found')
 
     def _check_prefix_suffix(self, hostname):
         """Feature 6: Check for prefix/suffix in domain"""
         value = 1 if '-' in hostname else 0
         
-        return {
-            'name': self.features['PREFIX_SUFFIX']['name'],
-            'weight': self.features['PREFIX_SUFFIX']['weight'],
-            'value': value,
-            'description': 'Domain contains prefix/suffix (-)' if value == 1 else 'No prefix/suffix in domain'
-        }
+        return self._create_feature_result('PREFIX_SUFFIX', value, 
+            'Domain contains prefix/suffix (-)' if value == 1 else 'No prefix/suffix in domain')
 
     def _check_multi_subdomain(self, hostname):
         """Feature 7: Check for multiple subdomains"""
@@ -199,34 +236,21 @@ class PhishingDetector:
         else:
             value = 0
             
-        return {
-            'name': self.features['MULTI_SUBDOMAIN']['name'],
-            'weight': self.features['MULTI_SUBDOMAIN']['weight'],
-            'value': value,
-            'description': f'Domain has {subdomains} subdomain(s)'
-        }
+        return self._create_feature_result('MULTI_SUBDOMAIN', value, f'Domain has {subdomains} subdomain(s)')
 
     def _check_ssl_certificate(self, parsed_url):
         """Feature 8: Check SSL certificate validity"""
         value = 0 if parsed_url.scheme == 'https' else -1
         
-        return {
-            'name': self.features['SSL_CERTIFICATE']['name'],
-            'weight': self.features['SSL_CERTIFICATE']['weight'],
-            'value': value,
-            'description': 'HTTPS protocol detected' if value == 0 else 'No SSL/HTTPS detected'
-        }
+        return self._create_feature_result('SSL_CERTIFICATE', value, 
+            'HTTPS protocol detected' if value == 0 else 'No SSL/HTTPS detected')
 
     def _check_domain_registration(self, domain):
         """Feature 9: Check domain registration length"""
         value = -1 if any(domain.endswith(tld) for tld in self.suspicious_tlds) else 0
         
-        return {
-            'name': self.features['DOMAIN_REGISTRATION']['name'],
-            'weight': self.features['DOMAIN_REGISTRATION']['weight'],
-            'value': value,
-            'description': 'Suspicious TLD detected' if value == -1 else 'Standard TLD used'
-        }
+        return self._create_feature_result('DOMAIN_REGISTRATION', value, 
+            'Suspicious TLD detected' if value == -1 else 'Standard TLD used')
 
     def _check_favicon_domain(self, url, domain):
         """Feature 10: Check favicon domain match"""
@@ -239,44 +263,27 @@ class PhishingDetector:
                 for link in favicon_links:
                     href = link.get('href', '')
                     if href.startswith('http') and domain not in href:
-                        return {
-                            'name': self.features['FAVICON_DOMAIN']['name'],
-                            'weight': self.features['FAVICON_DOMAIN']['weight'],
-                            'value': 1,
-                            'description': 'Favicon loaded from external domain'
-                        }
+                        return self._create_feature_result('FAVICON_DOMAIN', 1, 
+                            'Favicon loaded from external domain')
         except:
             pass
             
-        return {
-            'name': self.features['FAVICON_DOMAIN']['name'],
-            'weight': self.features['FAVICON_DOMAIN']['weight'],
-            'value': 0,
-            'description': 'Favicon matches domain'
-        }
+        return self._create_feature_result('FAVICON_DOMAIN', 0, 'Favicon matches domain')
 
     def _check_non_standard_port(self, port):
         """Feature 11: Check for non-standard ports"""
         standard_ports = [None, 80, 443]
         value = 1 if port not in standard_ports else 0
         
-        return {
-            'name': self.features['NON_STANDARD_PORT']['name'],
-            'weight': self.features['NON_STANDARD_PORT']['weight'],
-            'value': value,
-            'description': f'Non-standard port detected: {port}' if value == 1 else 'Standard port used'
-        }
+        return self._create_feature_result('NON_STANDARD_PORT', value, 
+            f'Non-standard port detected: {port}' if value == 1 else 'Standard port used')
 
     def _check_https_in_domain(self, hostname):
         """Feature 12: Check for HTTPS in domain name"""
         value = -1 if 'https' in hostname.lower() else 0
         
-        return {
-            'name': self.features['HTTPS_IN_DOMAIN']['name'],
-            'weight': self.features['HTTPS_IN_DOMAIN']['weight'],
-            'value': value,
-            'description': 'HTTPS found in domain name (suspicious)' if value == -1 else 'No HTTPS in domain name'
-        }
+        return self._create_feature_result('HTTPS_IN_DOMAIN', value, 
+            'HTTPS found in domain name (suspicious)' if value == -1 else 'No HTTPS in domain name')
 
     def _check_request_url(self, html_content, domain):
         """Feature 13: Check external request URLs"""
@@ -568,38 +575,52 @@ class PhishingDetector:
             return None
 
     def _create_feature_result(self, feature_key, value, description):
-        """Helper to create feature result"""
+        """Helper to create feature result as a (key, value, description) tuple"""
+        return feature_key, value, description
+
+    def schema(self):
+        """Feature metadata for compact responses, in vector order"""
         return {
-            'name': self.features[feature_key]['name'],
-            'weight': self.features[feature_key]['weight'],
-            'value': value,
-            'description': description
+            'version': SCHEMA_VERSION,
+            'features': [
+                {'key': key, 'name': meta['name'], 'weight': meta['weight']}
+                for key, meta in self.features.items()
+            ],
+            'classifications': list(CLASSIFICATIONS),
+            'thresholds': self.thresholds,
+            'binary_format': COMPACT_FORMAT.format
         }
 
-    def _calculate_score(self, features):
-        """Calculate overall phishing score"""
-        weighted_score = sum(feature['value'] * feature['weight'] for feature in features)
-        max_possible_score = sum(feature['weight'] for feature in features)
+    def calculate_score(self, values):
+        """Calculate overall phishing score from feature values in self.features order"""
+        weights = [meta['weight'] for meta in self.features.values()]
+        weighted_score = sum(value * weight for value, weight in zip(values, weights))
+        max_possible_score = sum(weights)
         
         normalized_score = (weighted_score / max_possible_score) * 100
+        classification, confidence = self.classify(normalized_score)
         
-        if normalized_score < -30:
+        return {
+            'score': normalized_score,
+            'classification': classification,
+            'confidence': confidence
+        }
+
+    def classify(self, normalized_score):
+        """Map a normalized score to (classification, confidence) using self.thresholds"""
+        if normalized_score < self.thresholds['phishing']:
             classification = 'Phishing'
             confidence = min(95, abs(normalized_score) + 50)
-        elif normalized_score < -10:
+        elif normalized_score < self.thresholds['suspicious']:
             classification = 'Suspicious'
             confidence = min(85, abs(normalized_score) + 40)
         else:
             classification = 'Safe'
             confidence = min(90, 60 + abs(normalized_score))
         
-        return {
-            'score': normalized_score,
-            'classification': classification,
-            'confidence': confidence
-        }
+        return classification, confidence
 
-    def _generate_recommendations(self, features, classification):
+    def generate_recommendations(self, values, classification):
         """Generate security recommendations"""
         recommendations = []
         
@@ -610,9 +631,9 @@ class PhishingDetector:
                 '🛡️ Use official links from trusted sources'
             ])
             
-            dangerous_features = [f for f in features if f['value'] == -1]
+            dangerous_features = values.count(-1)
             if dangerous_features:
-                recommendations.append(f'🚨 High-risk features detected: {len(dangerous_features)}')
+                recommendations.append(f'🚨 High-risk features detected: {dangerous_features}')
         else:
             recommendations.extend([
                 '✅ URL appears to be legitimate',
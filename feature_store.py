@@ -0,0 +1,240 @@
+"""
+PhishGuard - Feature Vector Store
+Append-only store of raw feature vectors with offline re-scoring
+"""
+
+import os
+import sys
+import json
+import time
+import array
+import struct
+import argparse
+import itertools
+import threading
+from collections import Counter
+from operator import mul
+from feature import PhishingDetector, SCHEMA_VERSION
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+class FeatureStore:
+    """Append-only file of fixed-size row records.
+
+    ``vectors.bin`` starts with a ``<4sHH`` header (magic, SCHEMA_VERSION,
+    feature count). Each analysis then appends one ``<d24b`` record: a float64
+    timestamp followed by its raw feature values in ``PhishingDetector.features``
+    order. A store written with a different schema is refused.
+    """
+
+    MAGIC = b'PGFV'
+    HEADER = struct.Struct('<4sHH')
+
+    def __init__(self, path):
+        self.path = path
+        self.feature_count = len(PhishingDetector().features)
+        self.record = struct.Struct(f'<d{self.feature_count}b')
+        self.values_offset = struct.calcsize('<d')
+        self.vectors_path = os.path.join(path, 'vectors.bin')
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def append(self, values, timestamp=None):
+        """Append one feature vector"""
+        if len(values) != self.feature_count:
+            raise ValueError(f"Expected {self.feature_count} feature values, got {len(values)}")
+
+        row = self.record.pack(time.time() if timestamp is None else timestamp, *values)
+
+        # The thread lock covers this process; flock covers other workers sharing the file
+        with self._lock, open(self.vectors_path, 'a+b') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                if size == 0:
+                    f.write(self.HEADER.pack(self.MAGIC, SCHEMA_VERSION, self.feature_count))
+                else:
+                    f.seek(0)
+                    self._check_header(f.read(self.HEADER.size))
+                    # Drop a partial record left by an interrupted write so later rows stay aligned
+                    partial = (size - self.HEADER.size) % self.record.size
+                    if partial:
+                        f.truncate(size - partial)
+                f.write(row)
+                f.flush()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def append_result(self, result, timestamp=None):
+        """Append the feature vector of an analyze_url result"""
+        self.append(result.values, timestamp)
+
+    def _check_header(self, header):
+        if len(header) < self.HEADER.size:
+            raise ValueError(f"Feature store {self.vectors_path} has a truncated header")
+        magic, version, feature_count = self.HEADER.unpack(header)
+        if magic != self.MAGIC:
+            raise ValueError(f"{self.vectors_path} is not a PhishGuard feature store")
+        if (version, feature_count) != (SCHEMA_VERSION, self.feature_count):
+            raise ValueError(
+                f"Feature store schema v{version} ({feature_count} features) does not match "
+                f"v{SCHEMA_VERSION} ({self.feature_count} features)"
+            )
+
+    def _read(self):
+        """Raw bytes of all complete records, after the header"""
+        try:
+            with open(self.vectors_path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return b''
+
+        if not data:
+            return b''
+        self._check_header(data[:self.HEADER.size])
+        data = data[self.HEADER.size:]
+        return data[:len(data) - len(data) % self.record.size]
+
+    def rows(self, since=None, until=None):
+        """Raw record bytes and the offsets of the rows inside an optional time window"""
+        data = self._read()
+        offsets = range(0, len(data), self.record.size)
+
+        # Timestamps are not guaranteed to be in order (clock changes, several workers),
+        # so the window is applied row by row
+        if since is not None or until is not None:
+            timestamps = array.array('d', b''.join(data[i:i + self.values_offset] for i in offsets))
+            offsets = [
+                offset for offset, timestamp in zip(offsets, timestamps)
+                if (since is None or timestamp >= since) and (until is None or timestamp < until)
+            ]
+
+        return data, offsets
+
+
+def _check_number(kind, key, value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{kind} for {key} must be a number, got {value!r}")
+
+def _tuned_detector(weights, thresholds):
+    """Detector with weights/thresholds overridden from a re-scoring config"""
+    tuned = PhishingDetector()
+
+    for key, weight in (weights or {}).items():
+        if key not in tuned.features:
+            raise ValueError(f"Unknown feature: {key}")
+        _check_number('Weight', key, weight)
+        tuned.features[key]['weight'] = weight
+    for key, threshold in (thresholds or {}).items():
+        if key not in tuned.thresholds:
+            raise ValueError(f"Unknown threshold: {key}")
+        _check_number('Threshold', key, threshold)
+        tuned.thresholds[key] = threshold
+
+    if sum(meta['weight'] for meta in tuned.features.values()) == 0:
+        raise ValueError("Feature weights must not sum to zero")
+
+    return tuned
+
+def _chunk_tables(current, tuned, bounds):
+    """Partial weighted sums for every possible value combination of each feature chunk
+
+    Each partial is ``current + tuned * 1j`` so one complex addition per chunk
+    scores a row under both configurations at once.
+    """
+    current_weights = [meta['weight'] for meta in current.features.values()]
+    tuned_weights = [meta['weight'] for meta in tuned.features.values()]
+
+    tables = []
+    for start, end in zip(bounds, bounds[1:]):
+        table = {}
+        for combo in itertools.product((-1, 0, 1), repeat=end - start):
+            table[array.array('b', combo).tobytes()] = complex(
+                sum(map(mul, combo, current_weights[start:end])),
+                sum(map(mul, combo, tuned_weights[start:end]))
+            )
+        tables.append(table)
+    return tables
+
+def rescore(store, weights=None, thresholds=None, since=None, until=None):
+    """Compare current classifications against new weights/thresholds
+
+    Returns a dict with the total row count and a ``shifts`` mapping of
+    ``(old_classification, new_classification)`` to row counts.
+    """
+    current = PhishingDetector()
+    tuned = _tuned_detector(weights, thresholds)
+    current_total = sum(meta['weight'] for meta in current.features.values())
+    tuned_total = sum(meta['weight'] for meta in tuned.features.values())
+
+    # Split each vector into three chunks and add their precomputed partial sums,
+    # so every row costs three slices and three dict lookups
+    count = store.feature_count
+    first, second, third = _chunk_tables(current, tuned, [0, count // 3, 2 * count // 3, count])
+    start = store.values_offset
+    a, b, end = start + count // 3, start + 2 * count // 3, start + count
+
+    data, offsets = store.rows(since, until)
+    try:
+        scores = Counter(
+            first[data[i + start:i + a]] + second[data[i + a:i + b]] + third[data[i + b:i + end]]
+            for i in offsets
+        )
+    except KeyError:
+        raise ValueError("Feature store contains values outside -1..1")
+
+    # Only distinct (current, tuned) score pairs need classifying
+    shifts = Counter()
+    for score, rows in scores.items():
+        old, _ = current.classify(score.real / current_total * 100)
+        new, _ = tuned.classify(score.imag / tuned_total * 100)
+        shifts[(old, new)] += rows
+
+    return {'total': sum(scores.values()), 'shifts': shifts}
+
+def _print_report(report):
+    total = report['total']
+    print(f"📦 Re-scored {total} stored feature vectors")
+    if not total:
+        return
+
+    changed = sum(count for (old, new), count in report['shifts'].items() if old != new)
+    print(f"🔁 Classification changed for {changed} ({changed / total * 100:.2f}%)")
+
+    for (old, new), count in sorted(report['shifts'].items()):
+        marker = '  ' if old == new else '->'
+        print(f"  {old:>10} {marker} {new:<10} {count:>10}  ({count / total * 100:.2f}%)")
+
+def main(argv=None):
+    default_store = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'feature_store')
+    parser = argparse.ArgumentParser(description='Re-score stored PhishGuard feature vectors')
+    parser.add_argument('--store', default=os.environ.get('PHISHGUARD_FEATURE_STORE', default_store),
+                        help='Feature store directory')
+    parser.add_argument('--config', help='JSON file with "weights" and/or "thresholds"')
+    parser.add_argument('--since', type=float, help='Only rows at or after this UNIX timestamp')
+    parser.add_argument('--until', type=float, help='Only rows before this UNIX timestamp')
+    args = parser.parse_args(argv)
+
+    config = {}
+    if args.config:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+
+    try:
+        store = FeatureStore(args.store)
+        report = rescore(store, config.get('weights'), config.get('thresholds'), args.since, args.until)
+    except ValueError as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
+
+    _print_report(report)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())